@@ -1,6 +1,6 @@
 import streamlit as st
-import time
 from inference import engine
+from jobs import jobs
 
 # Page config
 st.set_page_config(
@@ -12,6 +12,15 @@ st.set_page_config(
 
 # ... (styles remain same)
 
+# --- SIDEBAR ---
+with st.sidebar:
+    st.selectbox(
+        "Expert adapter",
+        engine.list_adapters(),
+        key="adapter",
+        help="LoRA adapters share one resident base model and are swapped per request."
+    )
+
 # --- MAIN CONTENT ---
 col1, col2 = st.columns([1, 4])
 
@@ -33,31 +42,67 @@ if "messages" not in st.session_state:
     })
 
 # Render Chat
-for message in st.session_state.messages:
+# Only the latest messages are rendered by default; older ones are only sent
+# to the browser when the user asks for them, so long chats stay cheap on reruns.
+RECENT_MESSAGES = 20
+
+history = st.session_state.messages
+archived = history[:-RECENT_MESSAGES]
+if archived and st.toggle("Show earlier messages", key="show_archive"):
+    st.markdown("\n\n---\n\n".join(
+        f"**{'You' if m['role'] == 'user' else 'NicheForge'}:** {m['content']}" for m in archived
+    ))
+    st.divider()
+
+for message in history[-RECENT_MESSAGES:]:
     role = message["role"]
     avatar = "👤" if role == "user" else "📚"
     
     with st.chat_message(role, avatar=avatar):
         st.markdown(message["content"])
 
+if "pending_job" not in st.session_state:
+    st.session_state.pending_job = None
+
 # Input Area
-if prompt := st.chat_input("How do I filter rows in Polars?"):
+if prompt := st.chat_input("How do I filter rows in Polars?", disabled=st.session_state.pending_job is not None):
     # Render User Message
     st.session_state.messages.append({"role": "user", "content": prompt})
     with st.chat_message("user", avatar="👤"):
         st.markdown(prompt)
 
-    # Render Bot Response
+    # Generation runs on the shared worker pool; this session only keeps the job id
+    st.session_state.pending_job = jobs.submit(
+        prompt,
+        temperature=st.session_state.get("temp", 0.7),
+        adapter=st.session_state.adapter
+    )
+
+
+# Render Bot Response
+# Polls the job as a fragment so only this bubble reruns while text streams in.
+@st.fragment(run_every=0.5 if st.session_state.pending_job else None)
+def render_pending():
+    job_id = st.session_state.pending_job
+    if job_id is None:
+        return
+    job = jobs.get(job_id)
+    if job is None:
+        # Expired or lost (e.g. server restart): full rerun re-enables chat_input
+        st.session_state.pending_job = None
+        st.rerun()
+
     with st.chat_message("assistant", avatar="📚"):
-        message_placeholder = st.empty()
-        
-        # simulated typing effect
-        with st.spinner("Processing..."):
-            try:
-                full_response = engine.generate(prompt, temperature=st.session_state.temp)
-                message_placeholder.markdown(full_response)
-            except Exception as e:
-                st.error(f"Error: {e}")
-                full_response = "I encountered an error generating the response."
-    
-    st.session_state.messages.append({"role": "assistant", "content": full_response})
+        if job.error:
+            st.error(f"Error: {job.error}")
+        st.markdown(job.text or "_Processing..._")
+
+    if job.done:
+        jobs.pop(job_id)
+        full_response = job.text if not job.error else "I encountered an error generating the response."
+        st.session_state.messages.append({"role": "assistant", "content": full_response})
+        st.session_state.pending_job = None
+        st.rerun()
+
+
+render_pending()
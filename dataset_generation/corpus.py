@@ -0,0 +1,179 @@
+import os
+import re
+import sys
+import json
+import glob
+import mmap
+import time
+import hashlib
+import threading
+
+SEGMENT_FILE = "segments.bin"
+INDEX_FILE = "index.jsonl"
+
+
+class CorpusStore:
+    """
+    Append-only corpus of scraped pages, stored as two files in `corpus_dir`:
+
+    - segments.bin: the UTF-8 text of every page version, back to back
+    - index.jsonl: one line per version with url, fetched_at, sha256,
+      offset and length into segments.bin
+
+    The latest index line for a URL wins. Re-adding an unchanged page is a
+    no-op, so re-scrapes only grow the store by what actually changed.
+    Reads go through a memory map of segments.bin; `read_bytes` returns a
+    zero-copy memoryview.
+    """
+
+    def __init__(self, corpus_dir="corpus"):
+        self.corpus_dir = corpus_dir
+        self.segment_path = os.path.join(corpus_dir, SEGMENT_FILE)
+        self.index_path = os.path.join(corpus_dir, INDEX_FILE)
+        self.entries = {}
+        self._mmap = None
+        self._lock = threading.Lock()
+
+        if not os.path.exists(corpus_dir):
+            os.makedirs(corpus_dir)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        segment_size = os.path.getsize(self.segment_path) if os.path.exists(self.segment_path) else 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from an interrupted run
+                if entry["offset"] + entry["length"] > segment_size:
+                    continue
+                self.entries[entry["url"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def add(self, url, text, fetched_at=None):
+        """Store a page version. Returns False if the text is unchanged."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            current = self.entries.get(url)
+            if current and current["sha256"] == digest:
+                return False
+
+            # Segment first, index second: a crash in between leaves
+            # unreferenced bytes, never an index line pointing at nothing.
+            with open(self.segment_path, "ab") as f:
+                offset = f.tell()
+                f.write(data)
+            entry = {
+                "url": url,
+                "fetched_at": fetched_at if fetched_at is not None else time.time(),
+                "sha256": digest,
+                "offset": offset,
+                "length": len(data),
+            }
+            self._repair_index_tail()
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries[url] = entry
+            return True
+
+    def _repair_index_tail(self):
+        # A last line without its newline would swallow the next entry.
+        # If it is complete JSON (_load_index already loaded it), just end
+        # the line; otherwise it is a torn write and is cut off.
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            f.seek(0)
+            data = f.read()
+            line_start = data.rfind(b"\n") + 1
+            try:
+                json.loads(data[line_start:])
+                f.write(b"\n")
+            except ValueError:
+                f.truncate(line_start)
+
+    def _view(self, end):
+        # Remap when the segment file has grown past the current mapping.
+        # The old map is left to the GC: callers may still hold views into it.
+        if self._mmap is None or len(self._mmap) < end:
+            with open(self.segment_path, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def read_bytes(self, url):
+        entry = self.entries[url]
+        start, end = entry["offset"], entry["offset"] + entry["length"]
+        if start == end:
+            return memoryview(b"")
+        return memoryview(self._view(end))[start:end]
+
+    def read(self, url):
+        return str(self.read_bytes(url), "utf-8")
+
+    def iter_entries(self, changed_since=None):
+        """Index entries, optionally only those fetched after `changed_since` (epoch seconds)."""
+        for entry in self.entries.values():
+            if changed_since is None or entry["fetched_at"] > changed_since:
+                yield entry
+
+    def iter_documents(self, changed_since=None):
+        """Yield (url, text) for the latest version of each page."""
+        for entry in self.iter_entries(changed_since):
+            yield entry["url"], self.read(entry["url"])
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def import_raw_dir(self, raw_dir="raw_data"):
+        """
+        Import the legacy one-file-per-URL layout. Uses the `Source:` header the
+        scraper wrote (falls back to the file name) and the file mtime as fetch time.
+
+        Scraped pages (with a `Source:` header) already in the store are skipped:
+        the scraper owns them and a leftover .txt is older. Hand-written docs
+        (no header) are re-imported when the file is newer than the stored
+        version; `add` ignores the call if the text did not change.
+        """
+        added = 0
+        for filepath in sorted(glob.glob(os.path.join(raw_dir, "*.txt"))):
+            with open(filepath, "r", encoding="utf-8") as f:
+                content = f.read()
+            match = re.match(r"Source: (\S+)\n\n", content)
+            if match:
+                url, text = match.group(1), content[match.end():]
+            else:
+                url, text = os.path.basename(filepath), content
+            mtime = os.path.getmtime(filepath)
+            stored = self.entries.get(url)
+            if stored and (match or mtime <= stored["fetched_at"]):
+                continue
+            if self.add(url, text, fetched_at=mtime):
+                added += 1
+        return added
+
+
+if __name__ == "__main__":
+    # Usage: python dataset_generation/corpus.py [raw_dir] [corpus_dir]
+    raw_dir = sys.argv[1] if len(sys.argv) > 1 else "raw_data"
+    corpus_dir = sys.argv[2] if len(sys.argv) > 2 else "corpus"
+    store = CorpusStore(corpus_dir)
+    added = store.import_raw_dir(raw_dir)
+    print(f"Imported {added} new/changed pages from {raw_dir}. Corpus now holds {len(store)} pages.")
@@ -1,10 +1,12 @@
 import os
+import sys
 import json
-import glob
 import time
 
 import ollama
 
+from corpus import CorpusStore
+
 def query_llm(text_chunk):
     system_prompt = """You are an expert at creating training datasets for fine-tuning LLMs. 
     Your task is to analyze the provided text and generate comprehensive Q&A pairs.
@@ -57,8 +59,9 @@ def query_llm(text_chunk):
         print(f"Error querying Ollama: {e}")
         return []
 
-def generate_dataset(input_dir, output_file):
-    files = glob.glob(os.path.join(input_dir, "*.txt"))
+def generate_dataset(corpus_dir, output_file, changed_since=None):
+    store = CorpusStore(corpus_dir)
+    entries = list(store.iter_entries(changed_since))
     all_data = []
     
     # Check if file exists to resume? (Simplification: just Append mode if possible, or read-modify-write)
@@ -69,14 +72,14 @@ def generate_dataset(input_dir, output_file):
         except:
             all_data = []
 
-    print(f"Found {len(files)} files to process. Proceeding incrementally...")
+    print(f"Found {len(entries)} pages to process. Proceeding incrementally...")
     
-    for file_idx, filepath in enumerate(files):
-        print(f"[{file_idx+1}/{len(files)}] Processing {filepath}...")
+    for file_idx, entry in enumerate(entries):
+        url = entry["url"]
+        print(f"[{file_idx+1}/{len(entries)}] Processing {url}...")
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-        except:
+            content = store.read(url)
+        except Exception:
             continue
             
         # Increase chunk size slightly to reduce number of calls? No, 2000 is okay.
@@ -108,4 +111,7 @@ def generate_dataset(input_dir, output_file):
     print(f"Done! Saved {len(all_data)} examples to {output_file}")
 
 if __name__ == "__main__":
-    generate_dataset("raw_data", "dataset.json")
+    # Usage: python dataset_generation/generator.py [changed_since_epoch_seconds]
+    changed_since = float(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    generate_dataset("corpus", "dataset.json", changed_since)
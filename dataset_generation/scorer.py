@@ -0,0 +1,188 @@
+import re
+import sys
+import json
+import math
+import random
+import hashlib
+
+CODE_BLOCK = re.compile(r"```")
+INLINE_CODE = re.compile(r"`[^`\n]+`|\b\w+\.\w+\(")
+WORD = re.compile(r"\w+")
+
+# Heuristic weights; a judge score (if enabled) is blended 50/50 with these
+LENGTH_WEIGHT = 0.3
+CODE_WEIGHT = 0.3
+NOVELTY_WEIGHT = 0.4
+# Output length (words) that counts as "rich"
+FULL_LENGTH_WORDS = 300
+# MinHash LSH for novelty: 16 bands x 2 rows finds pairs above ~0.25 Jaccard
+LSH_BANDS = 16
+LSH_ROWS = 2
+_MINHASH_MASKS = [random.Random(3407 + i).getrandbits(64) for i in range(LSH_BANDS * LSH_ROWS)]
+
+
+def as_text(value):
+    # The generator LLM sometimes emits structured outputs, e.g. {"language": ..., "code": ...}
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def length_score(text):
+    words = len(WORD.findall(text))
+    return min(1.0, math.log1p(words) / math.log1p(FULL_LENGTH_WORDS))
+
+
+def code_score(text):
+    if CODE_BLOCK.search(text) or '"code":' in text:
+        return 1.0
+    if INLINE_CODE.search(text):
+        return 0.5
+    return 0.0
+
+
+def shingles(text, n=2):
+    words = WORD.findall(text.lower())
+    return {tuple(words[i:i+n]) for i in range(max(1, len(words) - n + 1))}
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash LSH over shingle sets. `max_similarity` only computes the exact
+    Jaccard against pairs that share an LSH bucket, so scoring stays roughly
+    linear in the dataset size instead of comparing every pair with every other.
+    Overlap below the LSH threshold (~0.25) is reported as 0.
+    """
+
+    def __init__(self):
+        self.sets = []
+        self.buckets = {}
+
+    @staticmethod
+    def signature(grams):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(" ".join(g).encode("utf-8"), digest_size=8).digest(), "big")
+            for g in grams
+        ]
+        return [min(h ^ mask for h in hashes) for mask in _MINHASH_MASKS]
+
+    def _band_keys(self, grams):
+        sig = self.signature(grams)
+        return [(b, tuple(sig[b * LSH_ROWS:(b + 1) * LSH_ROWS])) for b in range(LSH_BANDS)]
+
+    def max_similarity(self, grams):
+        if not grams:
+            return 0.0
+        candidates = set()
+        for key in self._band_keys(grams):
+            candidates.update(self.buckets.get(key, ()))
+        return max((jaccard(grams, self.sets[i]) for i in candidates), default=0.0)
+
+    def add(self, grams):
+        if not grams:
+            return
+        idx = len(self.sets)
+        self.sets.append(grams)
+        for key in self._band_keys(grams):
+            self.buckets.setdefault(key, []).append(idx)
+
+
+def rarity_scores(texts):
+    """
+    Mean inverse document frequency of each text's distinct words, scaled to 0-1.
+    Pairs built from vocabulary that few other pairs use are treated as harder.
+    This is kept separate from length and code so the curriculum doesn't just
+    follow quality.
+    """
+    docs = [set(WORD.findall(t.lower())) for t in texts]
+    df = {}
+    for words in docs:
+        for w in words:
+            df[w] = df.get(w, 0) + 1
+    n = len(docs)
+    max_idf = math.log(n + 1) or 1.0
+    return [
+        (sum(math.log((n + 1) / df[w]) for w in words) / len(words)) / max_idf if words else 0.0
+        for words in docs
+    ]
+
+
+def judge_score(pair, model="qwen2.5:0.5b"):
+    """Optional 1-5 rating from a small Ollama model, mapped to 0-1. None on failure."""
+    import ollama
+    prompt = f"""Rate this training example for a documentation assistant on a scale of 1 to 5.
+    5 = accurate, specific and useful (e.g. explains with code). 1 = vague or just restates the question.
+    Reply with the number only.
+
+    Instruction: {as_text(pair["instruction"])}
+
+    Response: {as_text(pair["output"])}
+    """
+    try:
+        response = ollama.chat(model=model, messages=[{'role': 'user', 'content': prompt}])
+        match = re.search(r"[1-5]", response['message']['content'])
+        return (int(match.group(0)) - 1) / 4 if match else None
+    except Exception as e:
+        print(f"Judge failed: {e}")
+        return None
+
+
+def score_pairs(pairs, reference_pairs=(), judge_model=None):
+    """
+    Annotate each pair with:
+    - quality: how much a training step on it is worth (weights sampling)
+    - difficulty: how rare its vocabulary is (orders the curriculum, easy first)
+    Novelty is measured against `reference_pairs` and every earlier pair, and
+    also penalises outputs that mostly restate their instruction.
+    """
+    seen = NearDuplicateIndex()
+    for p in reference_pairs:
+        seen.add(shingles(as_text(p["instruction"]) + " " + as_text(p["output"])))
+    difficulties = rarity_scores(as_text(p["instruction"]) + " " + as_text(p["output"]) for p in pairs)
+    scored = []
+
+    for pair, difficulty in zip(pairs, difficulties):
+        instruction, output = as_text(pair["instruction"]), as_text(pair["output"])
+        length = length_score(output)
+        code = code_score(output)
+
+        grams = shingles(instruction + " " + output)
+        duplicate = seen.max_similarity(grams)
+        restatement = jaccard(shingles(instruction), shingles(output))
+        novelty = 1.0 - max(duplicate, restatement)
+        seen.add(grams)
+
+        quality = LENGTH_WEIGHT * length + CODE_WEIGHT * code + NOVELTY_WEIGHT * novelty
+        if judge_model:
+            judged = judge_score(pair, judge_model)
+            if judged is not None:
+                quality = 0.5 * quality + 0.5 * judged
+
+        scored.append(dict(pair, quality=round(quality, 4), difficulty=round(difficulty, 4)))
+    return scored
+
+
+def score_dataset(input_file, output_file, judge_model=None):
+    with open(input_file, "r", encoding="utf-8") as f:
+        pairs = json.load(f)
+
+    scored = score_pairs(pairs, judge_model=judge_model)
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(scored, f, indent=2)
+
+    if scored:
+        avg = sum(p["quality"] for p in scored) / len(scored)
+        low = sum(1 for p in scored if p["quality"] < 0.3)
+        print(f"Scored {len(scored)} pairs. Average quality: {avg:.2f}, low quality (<0.3): {low}")
+    print(f"Saved to {output_file}")
+
+
+if __name__ == "__main__":
+    # Usage: python dataset_generation/scorer.py [judge_model]
+    judge_model = sys.argv[1] if len(sys.argv) > 1 else None
+    score_dataset("dataset.json", "dataset_scored.json", judge_model)
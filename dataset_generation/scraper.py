@@ -1,20 +1,19 @@
-import os
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 import time
 import re
 
+from corpus import CorpusStore
+
 class DocScraper:
-    def __init__(self, base_url, output_dir="raw_data", max_pages=50):
+    def __init__(self, base_url, corpus_dir="corpus", max_pages=50):
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
-        self.output_dir = output_dir
+        self.corpus_dir = corpus_dir
         self.max_pages = max_pages
         self.visited = set()
-        
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        self.store = CorpusStore(corpus_dir)
 
     def is_valid_url(self, url):
         parsed = urlparse(url)
@@ -52,13 +51,8 @@ class DocScraper:
                 text = content_div.get_text(separator=' \n ')
                 cleaned_text = self.clean_text(text)
                 
-                # Save to file
-                filename = re.sub(r'[^a-zA-Z0-9]', '_', url) + ".txt"
-                filepath = os.path.join(self.output_dir, filename)
-                
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(f"Source: {url}\n\n")
-                    f.write(cleaned_text)
+                # Save to corpus (skipped if the page is unchanged)
+                self.store.add(url, cleaned_text)
                     
             # Find links
             for link in soup.find_all('a', href=True):
@@ -77,6 +71,6 @@ class DocScraper:
 if __name__ == "__main__":
     # Default to Polars docs as an example
     TARGET_URL = "https://docs.pola.rs/"
-    scraper = DocScraper(TARGET_URL, output_dir="raw_data", max_pages=20)
+    scraper = DocScraper(TARGET_URL, corpus_dir="corpus", max_pages=20)
     scraper.scrape_page(TARGET_URL)
-    print(f"Finished scraping. Files saved to {scraper.output_dir}")
+    print(f"Finished scraping. {len(scraper.store)} pages stored in {scraper.corpus_dir}")
@@ -1,12 +1,16 @@
-import json
 import os
+import sys
+import json
 from tqdm import tqdm
 
-# Mock configuration for demonstration if model not present
-MODEL_PATH = "../fine_tuning/lora_model" 
-BENCHMARK_FILE = "evaluation/test_set.json"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import engine
 
-import ollama
+BENCHMARK_FILE = "evaluation/test_set.json"
+RESULTS_FILE = "evaluation_results.json"
+# Which model produced RESULTS_FILE; judge.py only tracks adapter runs
+RESULTS_META_FILE = "evaluation_results_meta.json"
+TRAINING_INFO = os.path.join(engine.model_path, "training_info.json") # Written by fine_tuning/train.py
 
 def evaluate():
     print("Loading test questions...")
@@ -17,44 +21,22 @@ def evaluate():
         print(f"Test set not found at {BENCHMARK_FILE}. Exiting.")
         return
 
-    # Try to load local model, else fallback to Ollama
-    use_ollama = False
-    model_name = "mistral" # Baseline
-    
-    # Check for local adapter
-    if os.path.exists(MODEL_PATH):
-        print("Found local adapter. Attempting to load (requires GPU/Unsloth)...")
-        try:
-            from unsloth import FastLanguageModel
-            # Load model logic here (omitted for safety on CPU-only envs causing crashes). 
-            # If you have a GPU, uncomment the actual loading code.
-            print("Warning: Loading Unsloth model on this environment might be slow or fail. Switching to Ollama for stability.")
-            use_ollama = True
-        except ImportError:
-            print("Unsloth not installed. Falling back to Ollama.")
-            use_ollama = True
+    # The engine loads the trained adapter if possible (lora_model + Unsloth),
+    # else falls back to base Ollama model, else mock.
+    if engine.active_backend == "local_adapter":
+        print(f"Evaluating trained adapter from {engine.model_path}.")
     else:
-        print("No local adapter found. Using Ollama (baseline) for evaluation.")
-        use_ollama = True
+        print(f"No trained adapter loaded. Evaluating the {engine.active_backend} backend (baseline).")
 
     results = []
     
     for item in tqdm(questions, desc="Evaluating"):
         question = item["question"]
         
-        if use_ollama:
-            try:
-                # System prompt to act like the expert
-                response = ollama.chat(model=model_name, messages=[
-                    {'role': 'system', 'content': "You are an expert on Polars and this specific dataset."},
-                    {'role': 'user', 'content': question}
-                ])
-                answer = response['message']['content']
-            except Exception as e:
-                answer = f"Error calling Ollama: {e}"
-        else:
-            # Placeholder for actual Unsloth inference
-            answer = "[MOCK] Unsloth inference would happen here."
+        try:
+            answer = engine.generate(question)
+        except Exception as e:
+            answer = f"Error calling {engine.active_backend} backend: {e}"
 
         results.append({
             "question": question,
@@ -63,10 +45,17 @@ def evaluate():
         })
 
     # Save results
-    with open("evaluation_results.json", "w") as f:
+    with open(RESULTS_FILE, "w") as f:
         json.dump(results, f, indent=2)
+
+    meta = {"backend": engine.active_backend}
+    if engine.active_backend == "local_adapter" and os.path.exists(TRAINING_INFO):
+        with open(TRAINING_INFO, "r") as f:
+            meta["training"] = json.load(f)
+    with open(RESULTS_META_FILE, "w") as f:
+        json.dump(meta, f, indent=2)
     
-    print("\nEvaluation complete! Results saved to evaluation_results.json")
+    print(f"\nEvaluation complete! Results saved to {RESULTS_FILE}")
     print("Sample Result:")
     if results:
         print(f"Q: {results[0]['question']}")
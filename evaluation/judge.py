@@ -5,6 +5,39 @@ import mlflow
 
 EVAL_FILE = "evaluation_results.json"
 JUDGE_MODEL = "mistral" # Use the one user has pulled
+EVAL_META_FILE = "evaluation_results_meta.json" # Written by evaluate.py
+HISTORY_FILE = "evaluation/judge_history.json"
+
+def load_eval_meta():
+    if not os.path.exists(EVAL_META_FILE):
+        return {}
+    with open(EVAL_META_FILE, "r") as f:
+        return json.load(f)
+
+def report_step_savings(history, fingerprint):
+    """
+    For each sampler, the fewest training steps that matched the best random-order
+    score. Only runs on the same data (dataset + test set fingerprint) are compared.
+    """
+    history = [h for h in history if h.get("data_fingerprint") == fingerprint]
+    baseline = [h for h in history if h.get("sampler") == "random"]
+    if not baseline:
+        return
+    target = max(h["avg_score"] for h in baseline)
+    baseline_steps = min(h["max_steps"] for h in baseline if h["avg_score"] >= target)
+    print(f"\nSteps to reach {target:.2f}/5 (random order: {baseline_steps} steps):")
+    for sampler in sorted({h.get("sampler") for h in history} - {"random", None}):
+        reached = [h["max_steps"] for h in history if h.get("sampler") == sampler and h["avg_score"] >= target]
+        if not reached:
+            print(f"  {sampler}: not reached yet")
+            continue
+        steps = min(reached)
+        if steps < baseline_steps:
+            print(f"  {sampler}: {steps} steps ({1 - steps / baseline_steps:.0%} fewer)")
+        elif steps > baseline_steps:
+            print(f"  {sampler}: {steps} steps ({steps / baseline_steps - 1:.0%} more)")
+        else:
+            print(f"  {sampler}: {steps} steps (same)")
 
 def judge_answers():
     if not os.path.exists(EVAL_FILE):
@@ -76,12 +109,43 @@ def judge_answers():
         json.dump(scored_results, f, indent=2)
     print("Full report saved to evaluation/judge_report.json")
 
+    # Track score per training budget so samplers can be compared.
+    # Only results produced by a trained adapter count; one row per training run.
+    meta = load_eval_meta()
+    training_info = meta.get("training", {})
+    if meta.get("backend") != "local_adapter":
+        print(f"Results come from the {meta.get('backend', 'unknown')} backend, not a trained adapter; "
+              "not recorded in the training history.")
+    elif "run_id" not in training_info:
+        print("No training run info for the evaluated adapter; not recorded in the training history.")
+    else:
+        print(f"Model trained for {training_info['max_steps']} steps ({training_info['sampler']} sampling).")
+        history = []
+        if os.path.exists(HISTORY_FILE):
+            with open(HISTORY_FILE, "r") as f:
+                history = json.load(f)
+        history = [h for h in history if h.get("run_id") != training_info["run_id"]]
+        history.append({
+            "run_id": training_info["run_id"],
+            "avg_score": avg_score,
+            "max_steps": training_info["max_steps"],
+            "sampler": training_info["sampler"],
+            "data_fingerprint": training_info.get("data_fingerprint"),
+        })
+        with open(HISTORY_FILE, "w") as f:
+            json.dump(history, f, indent=2)
+        report_step_savings(history, training_info.get("data_fingerprint"))
+
     # MLOps: Track with MLflow
     try:
         mlflow.set_experiment("niche_model_eval")
         with mlflow.start_run():
             mlflow.log_metric("avg_quality_score", avg_score)
             mlflow.log_param("judge_model", JUDGE_MODEL)
+            mlflow.log_param("eval_backend", meta.get("backend"))
+            for key in ("max_steps", "sampler"):
+                if key in training_info:
+                    mlflow.log_param(f"train_{key}", training_info[key])
             mlflow.log_artifact("evaluation/judge_report.json")
         print("Logged metrics to MLflow.")
     except Exception as e:
@@ -0,0 +1,49 @@
+import math
+
+import torch
+from torch.utils.data import Sampler
+
+
+class CurriculumSampler(Sampler):
+    """
+    Draws `num_samples` training indices with probability proportional to each
+    example's quality score (see dataset_generation/scorer.py).
+
+    With curriculum=True, early draws come only from the easiest examples: the
+    pool starts at `start_fraction` of the dataset (sorted by difficulty) and
+    widens linearly to the full dataset over the first `ramp_fraction` of the
+    draws. Since the Trainer consumes indices in order, draw i maps to step
+    i // (batch_size * gradient_accumulation_steps).
+    """
+
+    def __init__(self, weights, difficulties, num_samples, curriculum=True,
+                 start_fraction=0.3, ramp_fraction=0.7, min_weight=0.05, seed=3407):
+        self.weights = torch.tensor(weights, dtype=torch.float).clamp(min=min_weight)
+        self.order = torch.argsort(torch.tensor(difficulties, dtype=torch.float))
+        self.num_samples = num_samples
+        self.curriculum = curriculum
+        self.start_fraction = start_fraction
+        self.ramp_fraction = ramp_fraction
+        self.seed = seed
+
+    def __len__(self):
+        return self.num_samples
+
+    def pool_size(self, i):
+        n = len(self.order)
+        if not self.curriculum:
+            return n
+        ramp = max(1, int(self.num_samples * self.ramp_fraction))
+        fraction = self.start_fraction + (1 - self.start_fraction) * min(1.0, i / ramp)
+        return max(1, math.ceil(fraction * n))
+
+    def __iter__(self):
+        generator = torch.Generator().manual_seed(self.seed)
+        pool_size, pool, weights = None, None, None
+
+        for i in range(self.num_samples):
+            size = self.pool_size(i)
+            if size != pool_size:
+                pool_size, pool = size, self.order[:size]
+                weights = self.weights[pool]
+            yield int(pool[torch.multinomial(weights, 1, generator=generator)])
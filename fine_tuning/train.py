@@ -12,9 +12,70 @@ import torch
 from trl import SFTTrainer
 from transformers import TrainingArguments
 from datasets import load_dataset
+import argparse
+import hashlib
 import json
+import time
+import uuid
+
+from sampling import CurriculumSampler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dataset_generation"))
+from scorer import score_dataset
+
+SCORED_DATASET = "dataset_scored.json"  # written by dataset_generation/scorer.py
+TEST_SET = "evaluation/test_set.json"
+
+
+class WeightedSFTTrainer(SFTTrainer):
+    """SFTTrainer that draws training examples from a custom sampler."""
+
+    def __init__(self, *args, train_sampler=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.custom_train_sampler = train_sampler
+
+    def _get_train_sampler(self, *args, **kwargs):
+        if self.custom_train_sampler is not None:
+            return self.custom_train_sampler
+        return super()._get_train_sampler(*args, **kwargs)
+
+
+def scored_dataset_is_stale():
+    """True if dataset_scored.json is missing or older than / out of sync with dataset.json."""
+    if not os.path.exists(SCORED_DATASET):
+        return True
+    if os.path.getmtime("dataset.json") > os.path.getmtime(SCORED_DATASET):
+        return True
+    with open("dataset.json", "r", encoding="utf-8") as f:
+        pairs = json.load(f)
+    with open(SCORED_DATASET, "r", encoding="utf-8") as f:
+        scored = json.load(f)
+    return len(pairs) != len(scored)
+
+
+def data_fingerprint():
+    """sha256 over the training pairs and the test set; judge.py only compares runs that share it."""
+    digest = hashlib.sha256()
+    for path in ("dataset.json", TEST_SET):
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def train(max_steps=60, sampler="curriculum", output_dir="lora_model"):
+    """
+    sampler: 'curriculum' (quality-weighted, easy -> hard), 'weighted'
+    (quality-weighted only) or 'random'. The first two use dataset_scored.json,
+    which is (re)built with the heuristic scorer if missing or stale. Run
+    dataset_generation/scorer.py yourself to include the optional judge.
+    """
+    if sampler != "random" and scored_dataset_is_stale():
+        print(f"{SCORED_DATASET} is missing or out of date. Rescoring dataset.json...")
+        score_dataset("dataset.json", SCORED_DATASET)
+    # Taken before training: the generator may still be appending to dataset.json
+    fingerprint = data_fingerprint()
 
-def train():
     max_seq_length = 2048 # Choose any! We auto support RoPE Scaling internally!
     dtype = None # None for auto detection. Float16 for Tesla T4, V100, Bfloat16 for Ampere+
     load_in_4bit = True # Use 4bit quantization to reduce memory usage. Can be False.
@@ -42,35 +103,20 @@ def train():
 
     # Load dataset
     # We expect a JSONL file with "instruction", "input", "output"
-    dataset = load_dataset("json", data_files="dataset.json", split="train")
+    data_file = "dataset.json" if sampler == "random" else SCORED_DATASET
+    dataset = load_dataset("json", data_files=data_file, split="train")
+
+    per_device_train_batch_size = 2
+    gradient_accumulation_steps = 4
+    train_sampler = None
+    if sampler != "random":
+        train_sampler = CurriculumSampler(
+            weights=dataset["quality"],
+            difficulties=dataset["difficulty"],
+            num_samples=max_steps * per_device_train_batch_size * gradient_accumulation_steps,
+            curriculum=sampler == "curriculum",
+        )
 
-    trainer = SFTTrainer(
-        model = model,
-        tokenizer = tokenizer,
-        train_dataset = dataset,
-        dataset_text_field = "text", # This is ignored if formatting_func is used, but SFTTrainer needs it? 
-        # Actually SFTTrainer needs formatting_func usually or packed dataset.
-        # Let's define a formatting function for Alpaca
-        max_seq_length = max_seq_length,
-        dataset_num_proc = 2,
-        packing = False, # Can make training 5x faster for short sequences.
-        args = TrainingArguments(
-            per_device_train_batch_size = 2,
-            gradient_accumulation_steps = 4,
-            warmup_steps = 5,
-            max_steps = 60, # Increase this for real training!
-            learning_rate = 2e-4,
-            fp16 = not torch.cuda.is_bf16_supported(),
-            bf16 = torch.cuda.is_bf16_supported(),
-            logging_steps = 1,
-            optim = "adamw_8bit",
-            weight_decay = 0.01,
-            lr_scheduler_type = "linear",
-            seed = 3407,
-            output_dir = "outputs",
-        ),
-    )
-    
     # Alpaca formatting
     alpaca_prompt = """Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
 
@@ -93,7 +139,7 @@ def train():
             texts.append(text)
         return { "text" : texts, }
 
-    trainer = SFTTrainer(
+    trainer = WeightedSFTTrainer(
         model = model,
         tokenizer = tokenizer,
         train_dataset = dataset,
@@ -102,11 +148,12 @@ def train():
         dataset_num_proc = 2,
         packing = False, 
         formatting_func = formatting_prompts_func,
+        train_sampler = train_sampler,
         args = TrainingArguments(
-            per_device_train_batch_size = 2,
-            gradient_accumulation_steps = 4,
+            per_device_train_batch_size = per_device_train_batch_size,
+            gradient_accumulation_steps = gradient_accumulation_steps,
             warmup_steps = 5,
-            max_steps = 60, 
+            max_steps = max_steps,
             learning_rate = 2e-4,
             fp16 = not torch.cuda.is_bf16_supported(),
             bf16 = torch.cuda.is_bf16_supported(),
@@ -119,14 +166,30 @@ def train():
         ),
     )
 
-    print("Starting training...")
+    print(f"Starting training ({max_steps} steps, {sampler} sampling)...")
     trainer_stats = trainer.train()
     print("Training complete.")
     
     # Save model
-    model.save_pretrained("lora_model")
-    tokenizer.save_pretrained("lora_model")
-    print("Model saved to lora_model")
+    model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    # Read by evaluation/judge.py so scores can be compared per training budget
+    with open(os.path.join(output_dir, "training_info.json"), "w") as f:
+        json.dump({
+            "run_id": f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}",
+            "max_steps": max_steps,
+            "sampler": sampler,
+            "examples": len(dataset),
+            "data_fingerprint": fingerprint,
+            "train_loss": trainer_stats.training_loss,
+        }, f, indent=2)
+    print(f"Model saved to {output_dir}")
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-steps", type=int, default=60)
+    parser.add_argument("--sampler", choices=["curriculum", "weighted", "random"], default="curriculum")
+    parser.add_argument("--output-dir", default="lora_model",
+                        help="e.g. adapters/<name> to add an extra expert for the app")
+    args = parser.parse_args()
+    train(max_steps=args.max_steps, sampler=args.sampler, output_dir=args.output_dir)
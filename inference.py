@@ -1,25 +1,156 @@
 import os
+import json
 import random
 import logging
+import threading
+from collections import OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_ADAPTER = "default"
+
+
+def adapter_base_model(path):
+    """base_model_name_or_path from an adapter's adapter_config.json (None if unreadable)."""
+    try:
+        with open(os.path.join(path, "adapter_config.json"), "r") as f:
+            return json.load(f).get("base_model_name_or_path")
+    except (OSError, ValueError):
+        return None
+
+
+class AdapterRegistry:
+    """
+    Keeps a single base model resident and attaches LoRA adapters on demand.
+    Adapters live in `adapters_dir/<name>/` (PEFT format, e.g. written by
+    `train.py --output-dir adapters/<name>`) and must share the resident base model.
+    At most `max_loaded` adapters stay attached; the least recently used one is
+    unloaded when a new one is needed. The default adapter is never evicted.
+    """
+
+    def __init__(self, adapters_dir="adapters", max_loaded=4):
+        self.adapters_dir = adapters_dir
+        self.max_loaded = max_loaded
+        self.model = None
+        self.base_model_name = None
+        self.available = {}
+        self._loaded = OrderedDict()
+        self._lock = threading.RLock()
+        self.discover()
+
+    def discover(self):
+        """Scan adapters_dir for adapter folders (those with an adapter_config.json)."""
+        if not os.path.isdir(self.adapters_dir):
+            return
+        for name in sorted(os.listdir(self.adapters_dir)):
+            path = os.path.join(self.adapters_dir, name)
+            if os.path.exists(os.path.join(path, "adapter_config.json")):
+                self.available.setdefault(name, path)
+
+    def register(self, name, path):
+        self.available[name] = path
+
+    def attach(self, model, resident=DEFAULT_ADAPTER):
+        """
+        Bind to a loaded PEFT model whose built-in adapter is `resident`.
+        Adapters trained on a different base model are dropped.
+        """
+        with self._lock:
+            self.model = model
+            self._loaded.clear()
+            self._loaded[resident] = self.available.get(resident)
+            self.base_model_name = adapter_base_model(self.available[resident])
+
+            for name, path in list(self.available.items()):
+                if name != resident and not self._matches_base(path):
+                    logger.warning(
+                        f"Skipping adapter '{name}': trained on {adapter_base_model(path)}, "
+                        f"resident base is {self.base_model_name}."
+                    )
+                    del self.available[name]
+
+    def _matches_base(self, path):
+        return self.base_model_name is None or adapter_base_model(path) == self.base_model_name
+
+    def names(self):
+        return list(self.available)
+
+    def loaded(self):
+        return list(self._loaded)
+
+    def ensure_loaded(self, name, pinned=()):
+        """
+        Load `name` if needed and mark it most recently used. Adapters in
+        `pinned` are never evicted to make room. Returns the adapter name.
+        """
+        name = name or DEFAULT_ADAPTER
+        with self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                return name
+            if name not in self.available:
+                raise KeyError(f"Unknown adapter '{name}'. Available: {self.names()}")
+            if not self._matches_base(self.available[name]):
+                raise ValueError(
+                    f"Adapter '{name}' was trained on {adapter_base_model(self.available[name])}, "
+                    f"not the resident base {self.base_model_name}."
+                )
+
+            while len(self._loaded) >= self.max_loaded:
+                if not self._evict_one(pinned):
+                    break
+
+            logger.info(f"Loading adapter '{name}' from {self.available[name]}...")
+            self.model.load_adapter(self.available[name], adapter_name=name)
+            self._loaded[name] = self.available[name]
+            return name
+
+    def activate(self, name):
+        """Make `name` the adapter used by the next single-adapter generate call."""
+        with self._lock:
+            name = self.ensure_loaded(name)
+            self.model.set_adapter(name)
+            return name
+
+    def _evict_one(self, pinned=()):
+        for victim in self._loaded:
+            if victim == DEFAULT_ADAPTER or victim in pinned:
+                continue
+            logger.info(f"Evicting adapter '{victim}' (LRU).")
+            self.model.delete_adapter(victim)
+            del self._loaded[victim]
+            return True
+        return False
+
+
 class InferenceEngine:
-    def __init__(self, mode="auto", model_path="lora_model", base_model="mistral"):
+    def __init__(self, mode="auto", model_path="lora_model", base_model="mistral",
+                 adapters_dir="adapters", max_loaded_adapters=4):
         """
         Initialize inference engine.
         mode: 'auto' (try local -> ollama -> mock), 'local', 'ollama', 'mock'
+        model_path is loaded once as the base model plus the 'default' adapter;
+        extra adapters in adapters_dir are hot-swapped on top of it.
         """
         self.mode = mode
         self.model_path = model_path
         self.base_model = base_model
         self.model = None
         self.tokenizer = None
+        self.adapters = AdapterRegistry(adapters_dir, max_loaded=max_loaded_adapters)
+        self.adapters.register(DEFAULT_ADAPTER, model_path)
         
         # Detected active backend
         self.active_backend = None
+        # One resident model: adapter switch + generate must not interleave
+        # across threads (the app runs generation on a worker pool).
+        self._local_lock = threading.Lock()
+        # Route rows of one batch to different adapters via PEFT's `adapter_names`.
+        # Off for Unsloth: its fast LoRA kernels read the active adapter and
+        # silently ignore `adapter_names`. Only enable on a plain PEFT model.
+        self.mixed_adapter_batches = False
         
         self._load_model()
 
@@ -37,6 +168,8 @@ class InferenceEngine:
                         load_in_4bit=True
                     )
                     FastLanguageModel.for_inference(self.model)
+                    self.tokenizer.padding_side = "left"  # batched generation
+                    self.adapters.attach(self.model)
                     self.active_backend = "local_adapter"
                     logger.info("Local adapter loaded successfully.")
                     return
@@ -63,15 +196,44 @@ class InferenceEngine:
         self.active_backend = "mock"
         logger.warning("Falling back to Mock mode.")
 
-    def generate(self, prompt, temperature=0.7):
+    def list_adapters(self):
+        """Adapter names selectable for the active backend."""
         if self.active_backend == "local_adapter":
-            return self._generate_local(prompt, temperature)
+            return self.adapters.names()
+        return [DEFAULT_ADAPTER]
+
+    def generate(self, prompt, temperature=0.7, adapter=None):
+        """
+        adapter: name of a registered LoRA adapter (local backend) or an Ollama
+        model tag (ollama backend). None uses the default model.
+        """
+        if self.active_backend == "local_adapter":
+            with self._local_lock:
+                return self._generate_local([prompt], temperature, [adapter])[0]
         elif self.active_backend == "ollama":
-            return self._generate_ollama(prompt, temperature)
+            return self._generate_ollama(prompt, temperature, adapter)
         else:
             return self._generate_mock(prompt)
 
-    def _generate_local(self, prompt, temperature):
+    def stream(self, prompt, temperature=0.7, adapter=None):
+        """Yield the response in chunks as they are produced."""
+        if self.active_backend == "ollama":
+            yield from self._stream_ollama(prompt, temperature, adapter)
+        elif self.active_backend == "mock":
+            for word in self._generate_mock(prompt).split(" "):
+                yield word + " "
+        else:
+            yield self.generate(prompt, temperature, adapter)
+
+    def generate_batch(self, prompts, temperature=0.7, adapters=None):
+        """Generate for several prompts, each optionally with its own adapter."""
+        adapters = adapters or [None] * len(prompts)
+        if self.active_backend == "local_adapter":
+            with self._local_lock:
+                return self._generate_local(prompts, temperature, adapters)
+        return [self.generate(p, temperature, a) for p, a in zip(prompts, adapters)]
+
+    def _generate_local(self, prompts, temperature, adapters):
         alpaca_prompt = """Below is an instruction that describes a task, paired with an input that provides further context. Write a response that appropriately completes the request.
 
 ### Instruction:
@@ -82,36 +244,95 @@ class InferenceEngine:
 
 ### Response:
 """
+        names = [a or DEFAULT_ADAPTER for a in adapters]
+        distinct = list(dict.fromkeys(names))
+
+        if len(distinct) == 1:
+            self.adapters.activate(names[0])
+            return self._run_local(alpaca_prompt, prompts, temperature)
+
+        if not self.mixed_adapter_batches:
+            return self._generate_grouped(alpaca_prompt, prompts, temperature, names)
+
+        # All adapters of a sub-batch must be attached at once. The default
+        # adapter always holds a slot, so at most max_loaded - 1 others fit.
+        capacity = max(1, self.adapters.max_loaded - 1)
+        extra = [n for n in distinct if n != DEFAULT_ADAPTER]
+        if len(extra) > capacity:
+            results = [None] * len(prompts)
+            for k in range(0, len(extra), capacity):
+                group = set(extra[k:k + capacity])
+                if k == 0:
+                    group.add(DEFAULT_ADAPTER)
+                idx = [i for i, n in enumerate(names) if n in group]
+                if not idx:
+                    continue
+                outputs = self._generate_local([prompts[i] for i in idx], temperature, [names[i] for i in idx])
+                for i, out in zip(idx, outputs):
+                    results[i] = out
+            return results
+
+        for name in distinct:
+            self.adapters.ensure_loaded(name, pinned=distinct)
+        return self._run_local(alpaca_prompt, prompts, temperature, adapter_names=names)
+
+    def _generate_grouped(self, alpaca_prompt, prompts, temperature, names):
+        """One sub-batch per adapter, switching the active adapter in between."""
+        results = [None] * len(prompts)
+        for name in dict.fromkeys(names):
+            idx = [i for i, n in enumerate(names) if n == name]
+            self.adapters.activate(name)
+            outputs = self._run_local(alpaca_prompt, [prompts[i] for i in idx], temperature)
+            for i, out in zip(idx, outputs):
+                results[i] = out
+        return results
+
+    def _run_local(self, alpaca_prompt, prompts, temperature, **generate_kwargs):
         inputs = self.tokenizer(
-            [alpaca_prompt.format(prompt, "", "")], 
-            return_tensors="pt"
+            [alpaca_prompt.format(p, "", "") for p in prompts], 
+            return_tensors="pt",
+            padding=len(prompts) > 1
         ).to("cuda")
         
         outputs = self.model.generate(
             **inputs, 
             max_new_tokens=128, 
-            temperature=temperature
+            temperature=temperature,
+            **generate_kwargs
         )
         # Decode and strip prompt
-        response = self.tokenizer.batch_decode(outputs)[0]
-        # Basic cleanup - split by response tag
-        if "### Response:" in response:
-            return response.split("### Response:")[-1].strip().replace("<|end_of_text|>", "")
-        return response
+        responses = []
+        for response in self.tokenizer.batch_decode(outputs):
+            # Basic cleanup - split by response tag
+            if "### Response:" in response:
+                response = response.split("### Response:")[-1].strip().replace("<|end_of_text|>", "")
+            responses.append(response)
+        return responses
 
-    def _generate_ollama(self, prompt, temperature):
-        import ollama
+    def _ollama_request(self, prompt, temperature, adapter):
         system_prompt = "You are a helpful expert assistant trained on Polars documentation."
-        response = ollama.chat(
-            model=self.base_model,
+        # Ollama swaps adapters itself: an adapter is served as its own model
+        # tag (Modelfile with FROM <base> + ADAPTER <path>) sharing the base weights.
+        model = adapter if adapter and adapter != DEFAULT_ADAPTER else self.base_model
+        return dict(
+            model=model,
             messages=[
                 {'role': 'system', 'content': system_prompt},
                 {'role': 'user', 'content': prompt}
             ],
             options={'temperature': temperature}
         )
+
+    def _generate_ollama(self, prompt, temperature, adapter=None):
+        import ollama
+        response = ollama.chat(**self._ollama_request(prompt, temperature, adapter))
         return response['message']['content']
 
+    def _stream_ollama(self, prompt, temperature, adapter=None):
+        import ollama
+        for chunk in ollama.chat(**self._ollama_request(prompt, temperature, adapter), stream=True):
+            yield chunk['message']['content']
+
     def _generate_mock(self, prompt):
         import time
         time.sleep(1)
@@ -0,0 +1,73 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from inference import engine
+
+logger = logging.getLogger(__name__)
+
+# Jobs nobody collected (closed tab, crashed session) are dropped after this.
+JOB_TTL_SECONDS = 15 * 60
+
+
+class GenerationJob:
+    def __init__(self, prompt, temperature, adapter):
+        self.id = uuid.uuid4().hex
+        self.prompt = prompt
+        self.temperature = temperature
+        self.adapter = adapter
+        self.text = ""
+        self.error = None
+        self.done = False
+        self.created = time.time()
+
+
+class JobManager:
+    """
+    Runs generation on a worker pool shared by every Streamlit session in the
+    process. Sessions only keep the job id, so reruns never block on or cancel
+    in-flight work; they poll `get(job_id)` for partial text instead.
+    """
+
+    def __init__(self, engine, max_workers=4):
+        self.engine = engine
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generate")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, prompt, temperature=0.7, adapter=None):
+        job = GenerationJob(prompt, temperature, adapter)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        self._pool.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pop(self, job_id):
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+    def _run(self, job):
+        try:
+            for chunk in self.engine.stream(job.prompt, job.temperature, job.adapter):
+                job.text += chunk
+        except Exception as e:
+            logger.error(f"Generation job {job.id} failed: {e}")
+            job.error = str(e)
+        finally:
+            job.done = True
+
+    def _prune(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.created < cutoff]:
+            del self._jobs[job_id]
+
+
+# Singleton shared across sessions, like `engine`
+jobs = JobManager(engine)
@@ -4,8 +4,10 @@ if "%1"=="setup" (
     goto :eof
 )
 if "%1"=="data" (
+    python dataset_generation/corpus.py
     python dataset_generation/scraper.py
     python dataset_generation/generator.py
+    python dataset_generation/scorer.py
     goto :eof
 )
 if "%1"=="eval" (